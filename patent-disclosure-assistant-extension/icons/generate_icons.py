@@ -1,14 +1,36 @@
 """
 生成专利技术交底书助手Chrome扩展图标
 需要安装: pip install Pillow
+（推荐）pip install pillow-simd —— Pillow的SIMD加速分支，可直接替换Pillow，无需修改代码
+PIL在用到它的函数内部才导入，仅导入本模块（如复用辅助函数）时不加载Pillow
 """
 
-from PIL import Image, ImageDraw, ImageFont
+import functools
 import os
 
+@functools.lru_cache(maxsize=16)
+def _get_font(path, size):
+    """按(字体路径, 字号)缓存字体对象，避免重复解析TTF文件"""
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype(path, size)
+    except OSError:
+        return ImageFont.load_default()
+
+@functools.lru_cache(maxsize=16)
+def _get_text_size(path, size, text):
+    """缓存文本尺寸，每种字号只测量一次"""
+    bbox = _get_font(path, size).getbbox(text)
+    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+
 def create_icon(size):
     """创建指定尺寸的图标"""
+    from PIL import Image, ImageDraw
+
     # 创建透明背景
+    # 圆形以外的四角必须透明，因此画布只能是RGBA，不能拆成不透明的RGB底图；
+    # ImageDraw在RGBA画布上直接写入像素值，并不做alpha混合，不存在额外的合成开销
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
 
@@ -32,25 +54,27 @@ def create_icon(size):
 
     # 计算缩放比例
     scale = size / 128
+    # 预先换算所有用到的128像素基准坐标
+    px = {k: int(k * scale) for k in (2, 3, 4, 6, 8, 16, 20, 24, 32, 58, 64, 82, 88, 100)}
 
     # 绘制背景圆形
-    margin = int(4 * scale)
+    margin = px[4]
     draw.ellipse([margin, margin, size - margin, size - margin],
                  fill=blue_rgb)
 
     # 绘制文档背景
-    doc_x = int(32 * scale)
-    doc_y = int(24 * scale)
-    doc_w = int(64 * scale)
-    doc_h = int(88 * scale)
-    radius = int(4 * scale)
+    doc_x = px[32]
+    doc_y = px[24]
+    doc_w = px[64]
+    doc_h = px[88]
+    radius = px[4]
 
     # 绘制圆角矩形
     draw.rounded_rectangle([doc_x, doc_y, doc_x + doc_w, doc_y + doc_h],
                           radius=radius, fill=white_rgb + (230,))
 
     # 绘制文档折角
-    fold_size = int(16 * scale)
+    fold_size = px[16]
     if size >= 32:
         fold_points = [
             (doc_x + doc_w - fold_size, doc_y),
@@ -60,55 +84,47 @@ def create_icon(size):
         draw.polygon(fold_points, fill=blue_dark_rgb)
 
     # 绘制专利符号圆圈
-    circle_radius = int(16 * scale)
-    circle_center = (size // 2, int(58 * scale))
+    circle_radius = px[16]
+    circle_center = (size // 2, px[58])
     if size >= 32:
         draw.ellipse([
             circle_center[0] - circle_radius,
             circle_center[1] - circle_radius,
             circle_center[0] + circle_radius,
             circle_center[1] + circle_radius
-        ], outline=blue_rgb, width=int(3 * scale))
+        ], outline=blue_rgb, width=px[3])
 
     # 绘制字母P
     if size >= 32:
-        font_size = int(20 * scale)
-        try:
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+        font_size = px[20]
+        font = _get_font("arial.ttf", font_size)
 
         text = "P"
-        # 获取文本边界框
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
+        # 获取文本尺寸
+        text_width, text_height = _get_text_size("arial.ttf", font_size, text)
 
         text_x = circle_center[0] - text_width // 2
-        text_y = circle_center[1] - text_height // 2 - int(2 * scale)
+        text_y = circle_center[1] - text_height // 2 - px[2]
         draw.text((text_x, text_y), text, fill=blue_rgb, font=font)
 
     # 绘制文本行
-    line_y_start = int(82 * scale)
-    line_spacing = int(8 * scale)
-    line_height = int(2 * scale)
+    line_y_start = px[82]
+    line_spacing = px[8]
+    line_height = px[2]
 
-    for i in range(3):
+    line_x = doc_x + px[8]
+    line_widths = (doc_w - px[16], doc_w - px[16], px[32])
+    line_fill = gray_rgb + (200,)
+
+    for i, line_width in enumerate(line_widths):
         line_y = line_y_start + i * line_spacing
-        line_width = doc_w - int(16 * scale)
-        if i == 2:
-            line_width = int(32 * scale)
-        draw.line([
-            doc_x + int(8 * scale),
-            line_y,
-            doc_x + int(8 * scale) + line_width,
-            line_y
-        ], fill=gray_rgb + (200,), width=line_height)
+        draw.line([line_x, line_y, line_x + line_width, line_y],
+                  fill=line_fill, width=line_height)
 
     # 绘制认证印章
     if size >= 48:
-        seal_center = (int(100 * scale), int(100 * scale))
-        seal_radius = int(16 * scale)
+        seal_center = (px[100], px[100])
+        seal_radius = px[16]
         draw.ellipse([
             seal_center[0] - seal_radius,
             seal_center[1] - seal_radius,
@@ -117,11 +133,11 @@ def create_icon(size):
         ], fill=green_rgb)
 
         # 绘制对勾
-        checkmark_thickness = int(3 * scale)
+        checkmark_thickness = px[3]
         checkmark_points = [
-            (seal_center[0] - int(8 * scale), seal_center[1]),
-            (seal_center[0] - int(2 * scale), seal_center[1] + int(6 * scale)),
-            (seal_center[0] + int(8 * scale), seal_center[1] - int(6 * scale))
+            (seal_center[0] - px[8], seal_center[1]),
+            (seal_center[0] - px[2], seal_center[1] + px[6]),
+            (seal_center[0] + px[8], seal_center[1] - px[6])
         ]
         draw.line([checkmark_points[0], checkmark_points[1]],
                  fill=white_rgb, width=checkmark_thickness)
@@ -130,6 +146,24 @@ def create_icon(size):
 
     return img
 
+def save_icon(icon, filename):
+    """保存PNG图标；颜色数不超过256时无损转为调色板PNG（PNG8）以减小体积"""
+    from PIL import Image
+
+    colors = icon.getcolors(maxcolors=256)
+    if colors is not None:
+        # 按实际出现的颜色精确建表，避免quantize近似取色导致失真
+        palette = [rgba for _, rgba in colors]
+        index = {bytes(rgba): i for i, rgba in enumerate(palette)}
+        raw = icon.tobytes()
+        indices = bytes(index[raw[i:i + 4]] for i in range(0, len(raw), 4))
+        paletted = Image.frombytes('P', icon.size, indices)
+        paletted.putpalette([channel for rgba in palette for channel in rgba], rawmode='RGBA')
+        icon = paletted
+
+    # optimize=True 会使用最高zlib压缩级别并尝试更优的编码参数
+    icon.save(filename, 'PNG', optimize=True)
+
 def main():
     """生成所有尺寸的图标"""
     icons_dir = os.path.dirname(os.path.abspath(__file__))
@@ -137,10 +171,12 @@ def main():
 
     print("Generating icon files...")
 
+    # 每个尺寸单独绘制：小尺寸按设计省略部分细节（如48像素以下不画印章），
+    # 且直接绘制的边缘颜色少，保存为调色板PNG时体积更小
     for size in sizes:
         icon = create_icon(size)
         filename = os.path.join(icons_dir, f'icon{size}.png')
-        icon.save(filename, 'PNG')
+        save_icon(icon, filename)
         print(f"[OK] Generated: {filename}")
 
     print("\nAll icons generated successfully!")
@@ -6,21 +6,45 @@ Extract key requirements and formatting standards for disclosure documents.
 
 import os
 import re
-import json
 from pathlib import Path
 
+from common import write_json
+
+# Common patterns for disclosure document requirements, compiled once. Each
+# keyword is scanned separately because several of them can share one line
+# (e.g. "格式要求：字体：宋体；字号：小四") and each must yield its own value.
+_STRUCTURE_PATTERNS = tuple(
+    re.compile(rf"{keyword}[：:]\s*(.*)")
+    for keyword in ("文档结构", "应包括", "必须包含", "章节")
+)
+_FORMATTING_PATTERNS = tuple(
+    re.compile(rf"{keyword}[：:]\s*(.*)")
+    for keyword in ("格式要求", "字体", "字号", "间距", "标题")
+)
+
+_SECTION_RE = re.compile(r"[一二三四五六七八九十]、\s*(.*?)[\n\r]")
+
+# Sample document elements; each is scanned on its own so that, for example,
+# a heading containing pipes still counts as a table row
+_TITLE_RE = re.compile(r"^#\s+(.*)$", re.MULTILINE)
+_SAMPLE_SECTION_RE = re.compile(r"^#{2,3}\s+(.*)$", re.MULTILINE)
+_TABLE_ROW_RE = re.compile(r"\|.*\|")
+_LIST_ITEM_RE = re.compile(r"^\s*[-*]\s+", re.MULTILINE)
+
 def read_file(file_path):
     """Read file content with error handling."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except UnicodeDecodeError:
-        with open(file_path, 'r', encoding='gbk') as f:
-            return f.read()
+        data = Path(file_path).read_bytes()
     except Exception as e:
         print(f"Error reading file {file_path}: {e}")
         return ""
 
+    # Read from disk once; fall back to GBK in memory if the file is not UTF-8
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('gbk', errors='replace')
+
 def extract_requirements_from_guidelines(content):
     """Extract writing requirements from guidelines."""
     requirements = {
@@ -31,35 +55,16 @@ def extract_requirements_from_guidelines(content):
         "sections": []
     }
 
-    # Common patterns for disclosure document requirements
-    structure_patterns = [
-        r"文档结构[：:]\s*(.*)",
-        r"应包括[：:]\s*(.*)",
-        r"必须包含[：:]\s*(.*)",
-        r"章节[：:]\s*(.*)"
-    ]
-
-    formatting_patterns = [
-        r"格式要求[：:]\s*(.*)",
-        r"字体[：:]\s*(.*)",
-        r"字号[：:]\s*(.*)",
-        r"间距[：:]\s*(.*)",
-        r"标题[：:]\s*(.*)"
-    ]
-
     # Extract structure requirements
-    for pattern in structure_patterns:
-        matches = re.findall(pattern, content)
-        requirements["structure"].extend(matches)
+    for pattern in _STRUCTURE_PATTERNS:
+        requirements["structure"].extend(pattern.findall(content))
 
     # Extract formatting requirements
-    for pattern in formatting_patterns:
-        matches = re.findall(pattern, content)
-        requirements["formatting"].extend(matches)
+    for pattern in _FORMATTING_PATTERNS:
+        requirements["formatting"].extend(pattern.findall(content))
 
     # Extract common sections
-    section_pattern = r"[一二三四五六七八九十]、\s*(.*?)[\n\r]"
-    sections = re.findall(section_pattern, content)
+    sections = _SECTION_RE.findall(content)
     if sections:
         requirements["sections"] = sections
 
@@ -75,19 +80,17 @@ def analyze_sample_structure(content):
     }
 
     # Extract title
-    title_match = re.search(r"^#\s+(.*)$", content, re.MULTILINE)
+    title_match = _TITLE_RE.search(content)
     if title_match:
         structure["title"] = title_match.group(1)
 
     # Extract section headers
-    section_pattern = r"^#{2,3}\s+(.*)$"
-    sections = re.findall(section_pattern, content, re.MULTILINE)
-    structure["sections"] = sections
+    structure["sections"] = _SAMPLE_SECTION_RE.findall(content)
 
-    # Count formatting elements
-    structure["formatting"]["tables"] = len(re.findall(r"\|.*\|", content))
-    structure["formatting"]["lists"] = len(re.findall(r"^\s*[-*]\s+", content, re.MULTILINE))
-    structure["formatting"]["code_blocks"] = len(re.findall(r"```", content))
+    # Count formatting elements without building match lists
+    structure["formatting"]["tables"] = sum(1 for _ in _TABLE_ROW_RE.finditer(content))
+    structure["formatting"]["lists"] = sum(1 for _ in _LIST_ITEM_RE.finditer(content))
+    structure["formatting"]["code_blocks"] = content.count("```")
 
     return structure
 
@@ -130,8 +133,7 @@ def save_specification_summary(specification, output_path):
     """Save specification summary to file."""
     # Save as JSON for programmatic use
     json_path = output_path / "specification.json"
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(specification, f, ensure_ascii=False, indent=2)
+    write_json(specification, json_path)
 
     # Save as Markdown for human reading
     md_path = output_path / "specification_summary.md"
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the disclosure workflow scripts.
+JSON reading and writing (using orjson when it is installed) and draft lookup.
+"""
+
+import functools
+import json
+import os
+from pathlib import Path
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:  # optional accelerator; the stdlib codec is used otherwise
+    orjson = None  # type: ignore[assignment]
+
+def read_json(json_path):
+    """Read a JSON file."""
+    if orjson is not None:
+        return orjson.loads(Path(json_path).read_bytes())
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@functools.lru_cache(maxsize=8)
+def _load_json_cached(path_str, mtime_ns):
+    """Parse a JSON file; the mtime in the cache key invalidates stale entries."""
+    return read_json(path_str)
+
+def load_json(path):
+    """Load a JSON file, reusing the parsed result while the file is unchanged."""
+    return _load_json_cached(str(path), path.stat().st_mtime_ns)
+
+def write_json(data, json_path):
+    """Write data as indented UTF-8 JSON."""
+    if orjson is not None:
+        json_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+def encode_json_line(data):
+    """Encode data as one compact UTF-8 JSON line; both codecs give the same bytes."""
+    if orjson is not None:
+        return orjson.dumps(data) + b"\n"
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode('utf-8') + b"\n"
+
+def decode_json_line(line):
+    """Decode one JSON line (bytes) as written by encode_json_line."""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+def find_latest_draft(drafts_dir):
+    """Return the most recently modified draft file in drafts_dir, or None.
+
+    Entries are filtered by name first, so stat() is only called for draft
+    files, not for every file in the directory.
+    """
+    latest_path = None
+    latest_mtime = None
+    try:
+        with os.scandir(drafts_dir) as entries:
+            for entry in entries:
+                if not (entry.name.startswith("technical_disclosure_draft_")
+                        and entry.name.endswith(".md")):
+                    continue
+                mtime = entry.stat().st_mtime
+                if latest_mtime is None or mtime > latest_mtime:
+                    latest_mtime = mtime
+                    latest_path = entry.path
+    except FileNotFoundError:
+        return None
+
+    return Path(latest_path) if latest_path else None
@@ -4,11 +4,24 @@ Generate initial technical disclosure draft based on collected information.
 Apply formatting and structural requirements from specifications.
 """
 
-import json
-import re
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
 
+from common import load_json
+
+# Fixed footer appended to every draft
+_DRAFT_FOOTER = (
+    "---\n\n"
+    "## 文档说明\n\n"
+    "1. 本文件为技术交底书草稿，基于收集的信息生成\n"
+    "2. 请仔细核对技术内容的准确性和完整性\n"
+    "3. 标记为'待补充'的部分需要进一步完善\n"
+    "4. 建议进行技术审核和格式检查\n\n"
+    "**生成工具**: Patent Disclosure Assistant\n"
+    "**版本**: 1.0\n"
+)
+
 def load_specifications():
     """Load specification summary from references directory."""
     script_dir = Path(__file__).parent
@@ -26,13 +39,12 @@ def load_specifications():
     # Try to load from JSON first
     if spec_json_path.exists():
         try:
-            with open(spec_json_path, 'r', encoding='utf-8') as f:
-                spec_data = json.load(f)
-                if "comprehensive_specs" in spec_data:
-                    specs = spec_data["comprehensive_specs"]
-                    specifications["document_structure"] = specs.get("document_structure", [])
-                    specifications["formatting_rules"] = specs.get("formatting_rules", [])
-                    specifications["required_sections"] = specs.get("required_sections", [])
+            spec_data = load_json(spec_json_path)
+            if "comprehensive_specs" in spec_data:
+                specs = spec_data["comprehensive_specs"]
+                specifications["document_structure"] = specs.get("document_structure", [])
+                specifications["formatting_rules"] = specs.get("formatting_rules", [])
+                specifications["required_sections"] = specs.get("required_sections", [])
         except Exception as e:
             print(f"Error loading specification JSON: {e}")
 
@@ -59,14 +71,37 @@ def load_collected_information():
 
     if info_path.exists():
         try:
-            with open(info_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            # Copy so callers cannot mutate the cached result
+            return dict(load_json(info_path))
         except Exception as e:
             print(f"Error loading collected information: {e}")
 
     # Return empty dict if no information found
     return {}
 
+def iter_cjk_terms(text, min_len=2, max_len=4):
+    """Lazily yield CJK terms as re.findall(r"[\\u4e00-\\u9fa5]{2,4}") would.
+
+    Runs longer than max_len are split into max_len chunks, and shorter
+    remainders are dropped when below min_len. Being a generator, callers
+    that only need the first few terms stop scanning early.
+    """
+    run_start = None
+    for i, char in enumerate(text):
+        if '\u4e00' <= char <= '\u9fa5':
+            if run_start is None:
+                run_start = i
+            elif i - run_start == max_len:
+                yield text[run_start:i]
+                run_start = i
+        elif run_start is not None:
+            if i - run_start >= min_len:
+                yield text[run_start:i]
+            run_start = None
+
+    if run_start is not None and len(text) - run_start >= min_len:
+        yield text[run_start:]
+
 def generate_document_title(info_dict):
     """Generate document title based on technical field and solution."""
     tech_field = info_dict.get("technical_field", "").strip()
@@ -74,8 +109,8 @@ def generate_document_title(info_dict):
 
     if tech_field and tech_solution:
         # Extract key terms
-        field_keywords = re.findall(r"[\u4e00-\u9fa5]{2,4}", tech_field)[:2]
-        solution_keywords = re.findall(r"[\u4e00-\u9fa5]{2,4}", tech_solution)[:3]
+        field_keywords = list(islice(iter_cjk_terms(tech_field), 2))
+        solution_keywords = list(islice(iter_cjk_terms(tech_solution), 3))
 
         if field_keywords and solution_keywords:
             return f"{''.join(field_keywords)}技术领域的{''.join(solution_keywords)}方法及系统"
@@ -84,27 +119,24 @@ def generate_document_title(info_dict):
 
 def apply_formatting_rules(content, formatting_rules):
     """Apply formatting rules to document content."""
-    formatted_content = content
-
-    # Apply basic formatting rules
+    # Collect the format comments first, then inject them under the title
+    # with a single replace instead of rewriting the document per rule
+    format_comments = []
     for rule in formatting_rules:
         if "字体" in rule and "宋体" in rule:
-            formatted_content = formatted_content.replace(
-                "# 技术交底书",
-                "# 技术交底书\n<!-- 字体: 宋体 -->"
-            )
+            format_comments.append("<!-- 字体: 宋体 -->")
         elif "字号" in rule and ("小四" in rule or "12pt" in rule):
-            formatted_content = formatted_content.replace(
-                "# 技术交底书",
-                "# 技术交底书\n<!-- 字号: 小四 -->"
-            )
+            format_comments.append("<!-- 字号: 小四 -->")
         elif "间距" in rule and ("1.5倍" in rule or "1.5" in rule):
-            formatted_content = formatted_content.replace(
-                "# 技术交底书",
-                "# 技术交底书\n<!-- 行距: 1.5倍 -->"
-            )
+            format_comments.append("<!-- 行距: 1.5倍 -->")
 
-    return formatted_content
+    if not format_comments:
+        return content
+
+    # Each rule used to be inserted directly below the title, so the most
+    # recently matched rule ends up first; keep that order
+    header = "\n".join(["# 技术交底书"] + format_comments[::-1])
+    return content.replace("# 技术交底书", header, 1)
 
 def generate_section_content(section_name, info_dict):
     """Generate content for specific section based on collected information."""
@@ -145,15 +177,15 @@ def generate_draft_document(info_dict, specifications):
     title = generate_document_title(info_dict)
 
     # Start document
-    document = f"# {title}\n\n"
+    parts = [f"# {title}\n\n"]
 
     # Add metadata
     current_date = datetime.now().strftime("%Y年%m月%d日")
-    document += f"**文档生成日期**: {current_date}\n"
-    document += f"**技术领域**: {info_dict.get('technical_field', '待补充')}\n"
-    document += f"**状态**: 草稿\n\n"
+    parts.append(f"**文档生成日期**: {current_date}\n")
+    parts.append(f"**技术领域**: {info_dict.get('technical_field', '待补充')}\n")
+    parts.append("**状态**: 草稿\n\n")
 
-    document += "---\n\n"
+    parts.append("---\n\n")
 
     # Generate sections
     sections = specifications.get("required_sections", [])
@@ -175,30 +207,22 @@ def generate_draft_document(info_dict, specifications):
         else:
             heading_level = "###"
 
-        document += f"{heading_level} {i}. {section_name}\n\n"
+        parts.append(f"{heading_level} {i}. {section_name}\n\n")
 
         # Generate section content
         content = generate_section_content(section_name, info_dict)
-        document += f"{content}\n\n"
+        parts.append(f"{content}\n\n")
 
         # Add placeholder for missing required content
         if content.startswith("待补充"):
-            document += f"<!-- 需要补充{section_name}的具体内容 -->\n\n"
+            parts.append(f"<!-- 需要补充{section_name}的具体内容 -->\n\n")
 
     # Add document footer
-    document += "---\n\n"
-    document += "## 文档说明\n\n"
-    document += "1. 本文件为技术交底书草稿，基于收集的信息生成\n"
-    document += "2. 请仔细核对技术内容的准确性和完整性\n"
-    document += "3. 标记为'待补充'的部分需要进一步完善\n"
-    document += "4. 建议进行技术审核和格式检查\n\n"
-
-    document += f"**生成工具**: Patent Disclosure Assistant\n"
-    document += f"**版本**: 1.0\n"
+    parts.append(_DRAFT_FOOTER)
 
     # Apply formatting rules
     formatted_document = apply_formatting_rules(
-        document,
+        "".join(parts),
         specifications.get("formatting_rules", [])
     )
 
@@ -219,6 +243,14 @@ def save_draft_document(document_content, output_dir):
 
     return filepath
 
+def count_draft_statistics(document_content):
+    """Count CJK characters and '待补充' placeholders for the summary."""
+    word_count = sum(1 for char in document_content if '\u4e00' <= char <= '\u9fa5')
+    # str.count is a single C-level scan; folding it into the Python loop above
+    # would only make it slower
+    placeholder_count = document_content.count("待补充")
+    return word_count, placeholder_count
+
 def main():
     """Main function for draft generation."""
     print("=" * 60)
@@ -265,7 +297,7 @@ def main():
     print(f"文件保存至: {filepath}")
 
     # Show document statistics
-    word_count = len(re.findall(r'[\u4e00-\u9fa5]', draft_document))
+    word_count, placeholder_count = count_draft_statistics(draft_document)
     section_count = len(specifications['required_sections'])
 
     print(f"\n文档统计:")
@@ -274,7 +306,6 @@ def main():
     print(f"- 生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
     # Show missing content warnings
-    placeholder_count = draft_document.count("待补充")
     if placeholder_count > 0:
         print(f"\n⚠️ 警告: 文档中包含 {placeholder_count} 处'待补充'内容")
         print("请完善这些部分以确保文档完整性")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Review checks run by review_document.py against a disclosure draft.
+
+This module is type-annotated so it can be compiled with mypyc
+(`cd scripts && mypyc review_checks.py`). `python scripts/review_document.py`
+then imports the compiled extension placed next to this file, and uses this
+source when the extension is absent.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterator
+
+# Patterns used by the review checks, compiled once at import time
+_PLACEHOLDER_RE = re.compile(r"待补充|待完善|TODO|FIXME|<!--.*?需要补充.*?-->", re.IGNORECASE)
+_TERMS_RE = re.compile(r"[\u4e00-\u9fa5]{2,6}技术|[\u4e00-\u9fa5]{2,6}方法|[\u4e00-\u9fa5]{2,6}系统")
+_HEADING_RE = re.compile(r"^(#+)\s", re.MULTILINE)
+# Sections with fewer CJK characters than this are reported as too short
+_MIN_SECTION_CHARS = 20
+# Level 2+ heading text, with (group 1) and without (group 2) "N." numbering
+_SECTION_HEADING_RE = re.compile(r"^#{2,}\s+((?:\d+\.\s*)?(.+?))\s*$", re.MULTILINE)
+_BLANKS_RE = re.compile(r"\n\s*\n\s*\n")
+
+def iter_sections(draft_content: str) -> Iterator[tuple[str, str]]:
+    """Yield (heading_marks, body) for every markdown heading in one linear pass.
+
+    The body runs from the end of the heading line to the start of the next
+    heading, so no backtracking over the document is needed.
+    """
+    headings = list(_HEADING_RE.finditer(draft_content))
+    for i, heading in enumerate(headings):
+        body_start = draft_content.find("\n", heading.end() - 1)
+        if i + 1 < len(headings):
+            body_end = headings[i + 1].start()
+        else:
+            body_end = len(draft_content)
+        if body_start == -1 or body_start > body_end:
+            body_start = body_end
+        yield heading.group(1), draft_content[body_start:body_end]
+
+def _count_cjk(text: str, limit: int) -> int:
+    """Count CJK characters in text, stopping as soon as limit is reached."""
+    count = 0
+    for char in text:
+        if '\u4e00' <= char <= '\u9fa5':
+            count += 1
+            if count >= limit:
+                break
+    return count
+
+def check_section_completeness(draft_content: str, required_sections: list[str]) -> tuple[list[str], list[str]]:
+    """Check if all required sections are present in the draft."""
+    missing_sections = []
+    present_sections = []
+
+    # Collect all section headers in one pass, so each required section is a
+    # set lookup instead of two regex scans of the whole draft
+    heading_titles = set()
+    for heading in _SECTION_HEADING_RE.finditer(draft_content):
+        heading_titles.add(heading.group(1))
+        heading_titles.add(heading.group(2))
+
+    for section in required_sections:
+        # Exact title first, then headers that start with the section name
+        if section in heading_titles or any(
+            title.startswith(section) for title in heading_titles
+        ):
+            present_sections.append(section)
+        else:
+            missing_sections.append(section)
+
+    return present_sections, missing_sections
+
+def check_content_quality(draft_content: str,
+                          sections: list[tuple[str, str]] | None = None) -> list[dict]:
+    """Check content quality and completeness.
+
+    sections may carry a precomputed iter_sections() result to share with
+    other checks; it is derived from draft_content when omitted.
+    """
+    issues = []
+    if sections is None:
+        sections = list(iter_sections(draft_content))
+
+    # Check for placeholder content (all placeholder kinds in one scan)
+    placeholder_count = sum(1 for _ in _PLACEHOLDER_RE.finditer(draft_content))
+    if placeholder_count:
+        issues.append({
+            "type": "placeholder_content",
+            "count": placeholder_count,
+            "description": f"发现 {placeholder_count} 处占位符内容需要补充"
+        })
+
+    # Check section length; counting stops at the threshold, so the exact
+    # count is only known (and only reported) for sections that are too short
+    for i, (_, section_content) in enumerate(sections):
+        word_count = _count_cjk(section_content, _MIN_SECTION_CHARS)
+        if word_count < _MIN_SECTION_CHARS:
+            issues.append({
+                "type": "short_section",
+                "section_index": i,
+                "word_count": word_count,
+                "description": f"第 {i+1} 个章节内容过短 ({word_count} 字)"
+            })
+
+    # Check technical terms consistency
+    technical_terms = _TERMS_RE.findall(draft_content)
+    if len(set(technical_terms)) < 3 and len(technical_terms) > 5:
+        issues.append({
+            "type": "term_consistency",
+            "description": "技术术语使用不一致或重复"
+        })
+
+    return issues
+
+def check_formatting_compliance(draft_content: str, formatting_rules: list[str],
+                                sections: list[tuple[str, str]] | None = None) -> list[str]:
+    """Check compliance with formatting rules.
+
+    sections is an optional precomputed iter_sections() result, used for the
+    heading levels instead of scanning the headings again.
+    """
+    violations = []
+
+    # Stringify the rules once and derive what they require; with no rules
+    # only the structural checks below apply
+    if formatting_rules:
+        rules_text = str(formatting_rules)
+        requires_songti = "字体" in rules_text and "宋体" in rules_text
+        requires_font_size = "字号" in rules_text and ("小四" in rules_text or "12pt" in rules_text)
+    else:
+        requires_songti = requires_font_size = False
+
+    # Check for basic formatting issues
+    if requires_songti:
+        if "<!-- 字体: 宋体 -->" not in draft_content:
+            violations.append("未指定字体为宋体")
+
+    if requires_font_size:
+        if "<!-- 字号: 小四 -->" not in draft_content and "<!-- 字号: 12pt -->" not in draft_content:
+            violations.append("未指定字号")
+
+    # Check heading hierarchy; only the heading marks are needed here
+    if sections is None:
+        levels = [len(marks) for marks in _HEADING_RE.findall(draft_content)]
+    else:
+        levels = [len(marks) for marks, _ in sections]
+    if levels:
+        if max(levels) - min(levels) > 2:
+            violations.append("标题层级跳跃过大")
+
+    # Check for proper spacing
+    blank_runs = sum(1 for _ in _BLANKS_RE.finditer(draft_content))
+    if blank_runs:
+        violations.append(f"发现 {blank_runs} 处连续空行")
+
+    return violations
@@ -4,12 +4,40 @@ Save final technical disclosure document to local storage.
 Manage organization and versioning of generated documents.
 """
 
-import json
 import re
 import shutil
 from datetime import datetime
 from pathlib import Path
 
+from common import decode_json_line, encode_json_line, find_latest_draft, read_json
+
+# Markers showing a document is still a draft, matched in a single scan
+_DRAFT_MARKER_RE = re.compile("|".join(re.escape(marker) for marker in [
+    "<!-- 需要补充",
+    "<!-- 字体:",
+    "<!-- 字号:",
+    "<!-- 行距:",
+    "**状态**: 草稿",
+    "本文件为技术交底书草稿",
+    "标记为'待补充'的部分"
+]))
+
+# Draft-only fragments replaced by apply_final_formatting
+_FINAL_REWRITE_RE = re.compile(
+    r"(?P<comment><!--[\s\S]*?-->)"
+    r"|(?P<status>\*\*状态\*\*: 草稿)"
+    r"|(?P<description>本文件为技术交底书草稿，基于收集的信息生成)"
+)
+
+# Filename cleanup for the technical field: characters that are invalid in
+# filenames are dropped, spaces and commas become underscores
+_FILENAME_TRANS = str.maketrans({
+    **dict.fromkeys('\\/*?:"<>|'),
+    " ": "_",
+    "，": "_",
+    ",": "_",
+})
+
 def get_final_document():
     """Get the final document content from user or file."""
     script_dir = Path(__file__).parent
@@ -17,13 +45,11 @@ def get_final_document():
     reviews_dir = script_dir.parent / "outputs" / "reviews"
 
     # Look for the most recent draft
-    draft_files = list(drafts_dir.glob("technical_disclosure_draft_*.md"))
-    if not draft_files:
+    latest_draft = find_latest_draft(drafts_dir)
+    if latest_draft is None:
         print("错误: 未找到草稿文件")
         return None, None
 
-    latest_draft = max(draft_files, key=lambda x: x.stat().st_mtime)
-
     # Check if there's a reviewed version
     review_pattern = f"review_report_{latest_draft.stem}.md"
     review_files = list(reviews_dir.glob(review_pattern))
@@ -34,44 +60,32 @@ def get_final_document():
         print(f"找到审核报告: {review_files[0].name}")
 
     try:
-        with open(latest_draft, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = latest_draft.read_text(encoding='utf-8')
         return content, latest_draft.stem
     except Exception as e:
         print(f"读取文件错误: {e}")
         return None, None
 
-def apply_final_formatting(document_content):
-    """Apply final formatting to document."""
-    formatted_content = document_content
+def apply_final_formatting(document_content, now=None):
+    """Apply final formatting to document, stamped with now (default: current time)."""
+    if now is None:
+        now = datetime.now()
 
     # Remove draft markers and comments
-    draft_markers = [
-        "<!-- 需要补充",
-        "<!-- 字体:",
-        "<!-- 字号:",
-        "<!-- 行距:",
-        "**状态**: 草稿",
-        "本文件为技术交底书草稿",
-        "标记为'待补充'的部分"
-    ]
-
-    for marker in draft_markers:
-        if marker in formatted_content:
-            # Remove entire comment block
-            formatted_content = re.sub(r"<!--.*?-->", "", formatted_content, flags=re.DOTALL)
+    strip_comments = _DRAFT_MARKER_RE.search(document_content) is not None
 
-    # Update status
-    formatted_content = formatted_content.replace(
-        "**状态**: 草稿",
-        "**状态**: 终稿"
-    )
+    def rewrite(match):
+        if match.lastgroup == "comment":
+            # Remove entire comment block
+            return "" if strip_comments else match.group(0)
+        if match.lastgroup == "status":
+            # Update status
+            return "**状态**: 终稿"
+        # Update document description
+        return "本文件为技术交底书终稿，已完成审核和确认"
 
-    # Update document description
-    formatted_content = formatted_content.replace(
-        "本文件为技术交底书草稿，基于收集的信息生成",
-        "本文件为技术交底书终稿，已完成审核和确认"
-    )
+    # Rewrite comments, status and description in a single pass
+    formatted_content = _FINAL_REWRITE_RE.sub(rewrite, document_content)
 
     # Add final document header
     final_header = """---
@@ -81,65 +95,82 @@ def apply_final_formatting(document_content):
 版本: 1.0
 ---
 """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
     final_header = final_header.format(timestamp=timestamp)
 
     # Insert header after title
-    lines = formatted_content.split('\n')
-    if lines and lines[0].startswith('# '):
-        lines.insert(1, final_header)
-        formatted_content = '\n'.join(lines)
+    if formatted_content.startswith('# '):
+        title, newline, body = formatted_content.partition('\n')
+        formatted_content = f"{title}\n{final_header}{newline}{body}"
 
     return formatted_content
 
-def generate_final_filename(base_name, tech_field):
-    """Generate appropriate filename for final document."""
+def generate_final_filename(base_name, tech_field, now=None):
+    """Generate appropriate filename for final document, dated now (default: current time)."""
+    if now is None:
+        now = datetime.now()
+
     # Clean technical field for filename
-    clean_field = re.sub(r'[\\/*?:"<>|]', "", tech_field)
-    clean_field = clean_field.replace(" ", "_").replace("，", "_").replace(",", "_")
-    if len(clean_field) > 30:
-        clean_field = clean_field[:30]
+    clean_field = tech_field.translate(_FILENAME_TRANS)[:30]
 
     # Generate timestamp
-    timestamp = datetime.now().strftime("%Y%m%d")
+    timestamp = now.strftime("%Y%m%d")
 
     # Create filename
     filename = f"技术交底书_{clean_field}_{timestamp}_v1.0.md"
 
     return filename
 
-def save_to_final_location(document_content, filename, output_base):
-    """Save document to final location with proper organization."""
+def save_to_final_location(document_content, filename, output_base, now=None):
+    """Save document to final location with proper organization.
+
+    The year/month directories are taken from now (default: current time).
+    """
+    if now is None:
+        now = datetime.now()
+
     # Create output directory structure
-    year = datetime.now().strftime("%Y")
-    month = datetime.now().strftime("%m")
+    year = now.strftime("%Y")
+    month = now.strftime("%m")
     output_dir = output_base / year / month
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Save document
+    # Save document (text mode, like the reports, so line endings are native)
     output_path = output_dir / filename
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(document_content)
+    output_path.write_text(document_content, encoding='utf-8')
 
-    # Create backup copy
+    # Create backup copy from the content in memory rather than reading the
+    # main file back, then carry over its metadata as shutil.copy2 would
     backup_dir = output_base / "backups" / year / month
     backup_dir.mkdir(parents=True, exist_ok=True)
     backup_path = backup_dir / filename
-    shutil.copy2(output_path, backup_path)
+    backup_path.write_text(document_content, encoding='utf-8')
+    shutil.copystat(output_path, backup_path)
 
     return output_path, backup_path
 
-def update_document_index(document_info, index_path):
-    """Update document index for tracking."""
-    index_data = []
+def read_document_index(index_path):
+    """Read all entries of the JSONL document index."""
+    if not index_path.exists():
+        return []
+
+    with open(index_path, 'rb') as f:
+        return [decode_json_line(line) for line in f if line.strip()]
 
-    # Load existing index
-    if index_path.exists():
+def update_document_index(document_info, index_path):
+    """Append an entry to the document index for tracking.
+
+    The index is JSON Lines, so saving a document appends one line instead
+    of re-reading and rewriting every earlier entry.
+    """
+    # Carry entries over from the old JSON-array index on first use
+    legacy_path = index_path.with_suffix(".json")
+    legacy_entries = []
+    if not index_path.exists() and legacy_path.exists():
         try:
-            with open(index_path, 'r', encoding='utf-8') as f:
-                index_data = json.load(f)
+            legacy_entries = read_json(legacy_path)
         except:
-            index_data = []
+            legacy_entries = []
 
     # Add new entry
     index_entry = {
@@ -151,46 +182,45 @@ def update_document_index(document_info, index_path):
         "version": document_info["version"]
     }
 
-    index_data.append(index_entry)
-
-    # Save index
-    with open(index_path, 'w', encoding='utf-8') as f:
-        json.dump(index_data, f, ensure_ascii=False, indent=2)
+    with open(index_path, 'ab') as f:
+        for entry in legacy_entries:
+            f.write(encode_json_line(entry))
+        f.write(encode_json_line(index_entry))
 
 def generate_save_report(document_info, output_path, backup_path):
     """Generate save operation report."""
-    report = f"# 文档保存报告\n\n"
-
-    report += f"## 保存详情\n"
-    report += f"- **文档名称**: {document_info['filename']}\n"
-    report += f"- **技术领域**: {document_info['technical_field']}\n"
-    report += f"- **保存时间**: {document_info['save_date']}\n"
-    report += f"- **文档版本**: {document_info['version']}\n"
-    report += f"- **主文件路径**: {output_path}\n"
-    report += f"- **备份文件路径**: {backup_path}\n"
-
-    report += f"\n## 文件信息\n"
-    report += f"- **文件大小**: {document_info['file_size']} 字符\n"
-    report += f"- **章节数量**: {document_info['section_count']}\n"
-    report += f"- **保存状态**: ✅ 成功\n"
-
-    report += f"\n## 目录结构\n"
-    report += f"文档已按照以下结构保存:\n"
-    report += f"```
+    parts = [f"# 文档保存报告\n\n"]
+
+    parts.append(f"## 保存详情\n")
+    parts.append(f"- **文档名称**: {document_info['filename']}\n")
+    parts.append(f"- **技术领域**: {document_info['technical_field']}\n")
+    parts.append(f"- **保存时间**: {document_info['save_date']}\n")
+    parts.append(f"- **文档版本**: {document_info['version']}\n")
+    parts.append(f"- **主文件路径**: {output_path}\n")
+    parts.append(f"- **备份文件路径**: {backup_path}\n")
+
+    parts.append(f"\n## 文件信息\n")
+    parts.append(f"- **文件大小**: {document_info['file_size']} 字符\n")
+    parts.append(f"- **章节数量**: {document_info['section_count']}\n")
+    parts.append(f"- **保存状态**: ✅ 成功\n")
+
+    parts.append(f"\n## 目录结构\n")
+    parts.append(f"文档已按照以下结构保存:\n")
+    parts.append(f"""```
 {output_path.parent}
 ├── {output_path.name} (主文件)
 └── backups/
     └── {backup_path.parent.name}/
         └── {backup_path.name} (备份文件)
-```\n"
+```\n""")
 
-    report += f"\n## 后续操作建议\n"
-    report += f"1. 验证文档内容的准确性和完整性\n"
-    report += f"2. 根据需要打印或分享文档\n"
-    report += f"3. 定期检查备份文件的完整性\n"
-    report += f"4. 更新相关专利申报记录\n"
+    parts.append(f"\n## 后续操作建议\n")
+    parts.append(f"1. 验证文档内容的准确性和完整性\n")
+    parts.append(f"2. 根据需要打印或分享文档\n")
+    parts.append(f"3. 定期检查备份文件的完整性\n")
+    parts.append(f"4. 更新相关专利申报记录\n")
 
-    return report
+    return "".join(parts)
 
 def main():
     """Main function for document saving."""
@@ -213,15 +243,19 @@ def main():
     print(f"技术领域: {tech_field}")
     print(f"文档长度: {len(document_content)} 字符")
 
+    # Use one timestamp for the header, filename, directories and report, so
+    # they cannot disagree when the save straddles midnight or a month end
+    now = datetime.now()
+
     # Apply final formatting
     print("\n应用最终格式...")
-    final_content = apply_final_formatting(document_content)
+    final_content = apply_final_formatting(document_content, now)
 
     # Count sections
     section_count = len(re.findall(r"^#+\s+\d+\.", final_content, re.MULTILINE))
 
     # Generate filename
-    filename = generate_final_filename(draft_stem, tech_field)
+    filename = generate_final_filename(draft_stem, tech_field, now)
     print(f"生成文件名: {filename}")
 
     # Determine save location
@@ -231,14 +265,14 @@ def main():
     # Save document
     print("\n保存文档...")
     output_path, backup_path = save_to_final_location(
-        final_content, filename, save_base
+        final_content, filename, save_base, now
     )
 
     # Prepare document info
     document_info = {
         "filename": filename,
         "technical_field": tech_field,
-        "save_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "save_date": now.strftime("%Y-%m-%d %H:%M:%S"),
         "file_path": output_path,
         "backup_path": backup_path,
         "version": "1.0",
@@ -247,16 +281,15 @@ def main():
     }
 
     # Update index
-    index_path = save_base / "document_index.json"
+    index_path = save_base / "document_index.jsonl"
     update_document_index(document_info, index_path)
 
     # Generate save report
     report_content = generate_save_report(document_info, output_path, backup_path)
-    report_path = save_base / "reports" / f"save_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+    report_path = save_base / "reports" / f"save_report_{now.strftime('%Y%m%d_%H%M%S')}.md"
     report_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(report_content)
+    report_path.write_text(report_content, encoding='utf-8')
 
     print(f"\n✅ 文档保存完成!")
     print(f"主文件: {output_path}")